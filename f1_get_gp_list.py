@@ -1,16 +1,16 @@
 # f1_get_gp_list.py
-import requests
-import json
+from json_utils import dumps, dumps_bytes, loads
+from http_session import API_BASE, SESSION as _SESSION
 import sys
 import os
 
 def get_schedule(year):
     """지정된 연도의 모든 'Race' 세션 정보를 가져옵니다."""
     try:
-        url = f"https://api.openf1.org/v1/sessions?year={year}&session_name=Race"
-        response = requests.get(url)
+        url = f"{API_BASE}/sessions?year={year}&session_name=Race"
+        response = _SESSION.get(url)
         response.raise_for_status()
-        data = response.json()
+        data = loads(response.content)
         
         schedule = []
         for session in data:
@@ -33,15 +33,12 @@ def get_schedule(year):
         
         output_path = os.path.join(output_dir, "schedule.json")
         
-        output_json = json.dumps(schedule, indent=2)
-        print(output_json)
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(output_json)
+        with open(output_path, "wb") as f:
+            f.write(dumps_bytes(schedule, indent=2))
         print(f"\n[성공] {output_path} 파일에 저장되었습니다.")
 
     except Exception as e:
-        print(json.dumps([{"error": f"API 요청 실패: {e}"}]))
+        print(dumps([{"error": f"API 요청 실패: {e}"}]))
 
 if __name__ == "__main__":
     target_year = 2025
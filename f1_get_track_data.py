@@ -1,19 +1,29 @@
-# f1_get_replay_data.py
+# f1_get_track_data.py
 import sys
-import json
+from json_utils import dumps, loads
+from http_session import API_BASE, SESSION as _SESSION, expire_after_for
 import requests
 import pandas as pd
 import time
 
-API_BASE = "https://api.openf1.org/v1"
+def get_session_end(session_key):
+    """세션 종료 시각(date_end)을 가져옵니다. 알 수 없으면 None."""
+    try:
+        response = _SESSION.get(f"{API_BASE}/sessions", params={"session_key": session_key}, timeout=30)
+        response.raise_for_status()
+        sessions = loads(response.content)
+    except (requests.RequestException, ValueError):
+        return None
+    return sessions[0].get("date_end") if sessions else None
 
-def fetch_api(endpoint, params):
+def fetch_api(endpoint, params, expire_after):
     try:
         url = f"{API_BASE}/{endpoint}"
-        response = requests.get(url, params=params, timeout=600)
+        response = _SESSION.get(url, params=params, timeout=600, expire_after=expire_after)
         response.raise_for_status()
-        time.sleep(1)
-        return response.json()
+        if not response.from_cache:
+            time.sleep(1)
+        return loads(response.content)
     except requests.RequestException as e:
         return {"error": f"API fetching failed for {endpoint}: {str(e)}"}
 
@@ -61,18 +71,20 @@ def process_data(session_key, locations, laps, positions):
 
 def main():
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "session_key 인자가 필요합니다."}))
+        print(dumps({"error": "session_key 인자가 필요합니다."}))
         sys.exit(1)
     session_key = sys.argv[1]
     
     params = {"session_key": session_key}
-    locations = fetch_api("location", params)
-    laps = fetch_api("laps", params)
-    positions = fetch_api("position", params)
+    # 끝난 지 오래된 세션만 오래 캐시하고, 진행 중이거나 최근 세션은 짧게 보관
+    expire_after = expire_after_for(get_session_end(session_key))
+    locations = fetch_api("location", params, expire_after)
+    laps = fetch_api("laps", params, expire_after)
+    positions = fetch_api("position", params, expire_after)
     
     replay_data = process_data(session_key, locations, laps, positions)
     
-    print(json.dumps(replay_data, ensure_ascii=False))
+    print(dumps(replay_data))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -47,6 +47,93 @@ function runPython(scriptPath, args = []) {
     });
 }
 
+// --- race_times용 장기 실행 Python 워커 (fastf1 import 비용을 요청마다 반복하지 않음) ---
+const PYTHON_WORKER_TIMEOUT_MS = 120000;
+let raceTimesWorker = null;
+let nextWorkerRequestId = 1;
+const pendingWorkerRequests = new Map();
+
+function getRaceTimesWorker(scriptPath) {
+    if (raceTimesWorker) return raceTimesWorker;
+
+    const proc = spawn('python', ['-X', 'utf8', scriptPath, '--server']);
+    const worker = { proc, buffer: '' };
+
+    const fail = (error) => {
+        // 이미 교체된(재시작된) 워커의 종료는 무시
+        if (raceTimesWorker !== worker) return;
+        raceTimesWorker = null;
+        for (const { reject, timer } of pendingWorkerRequests.values()) {
+            clearTimeout(timer);
+            reject(error);
+        }
+        pendingWorkerRequests.clear();
+    };
+
+    proc.stdout.setEncoding('utf8');
+    proc.stdout.on('data', (data) => {
+        worker.buffer += data;
+        let newline;
+        while ((newline = worker.buffer.indexOf('\n')) !== -1) {
+            const line = worker.buffer.slice(0, newline).trim();
+            worker.buffer = worker.buffer.slice(newline + 1);
+            if (!line) continue;
+
+            let message;
+            try { message = JSON.parse(line); } catch {
+                console.error(`[Python Worker] Ignoring non-JSON output: ${line}`);
+                continue;
+            }
+            const pending = pendingWorkerRequests.get(message?.id);
+            if (!pending) {
+                console.error(`[Python Worker] Ignoring response for unknown request id: ${message?.id}`);
+                continue;
+            }
+            pendingWorkerRequests.delete(message.id);
+            clearTimeout(pending.timer);
+            pending.resolve(message.result);
+        }
+    });
+    proc.stderr.on('data', (data) => console.error(`[Python STDERR]: ${data.toString().trim()}`));
+    proc.stdin.on('error', fail);
+    proc.on('error', fail);
+    proc.on('close', (code) => fail(new Error(`Python worker exited with code ${code}`)));
+
+    raceTimesWorker = worker;
+    return worker;
+}
+
+function sendToWorker(scriptPath, id, payload) {
+    getRaceTimesWorker(scriptPath).proc.stdin.write(JSON.stringify({ ...payload, id }) + '\n');
+}
+
+// 멈춘 워커를 종료하고, 남은 요청은 새 워커로 다시 보냄
+function restartRaceTimesWorker(scriptPath) {
+    const stalled = raceTimesWorker;
+    raceTimesWorker = null;
+    if (stalled) stalled.proc.kill();
+    for (const [id, { payload }] of pendingWorkerRequests) {
+        sendToWorker(scriptPath, id, payload);
+    }
+}
+
+// 응답은 요청마다 붙인 id로 매칭하며, 제한 시간 안에 응답이 없으면 실패 처리
+function requestPythonWorker(scriptPath, payload) {
+    return new Promise((resolve, reject) => {
+        if (!fs.existsSync(scriptPath)) {
+            return reject(new Error(`Python script not found: ${scriptPath}`));
+        }
+        const id = nextWorkerRequestId++;
+        const timer = setTimeout(() => {
+            pendingWorkerRequests.delete(id);
+            reject(new Error(`Python worker timed out after ${PYTHON_WORKER_TIMEOUT_MS}ms`));
+            restartRaceTimesWorker(scriptPath);
+        }, PYTHON_WORKER_TIMEOUT_MS);
+        pendingWorkerRequests.set(id, { resolve, reject, timer, payload });
+        sendToWorker(scriptPath, id, payload);
+    });
+}
+
 async function fetchRaceTimingFromPython(sessionInfo) {
     const scriptPath = path.join(ROOT_DIR, 'get_replay_data.py');
     try {
@@ -64,15 +151,12 @@ async function fetchRaceTimingFromPython(sessionInfo) {
             throw new Error(`Incomplete session data from schedule.json: Year='${year}', Event='${eventName}', Session='${sessionName}'`);
         }
 
-        const args = [
-            'race_times',
-            '--year', String(year),
-            '--event', eventName,
-            '--session', sessionName
-        ];
-
-        const rawOutput = await runPython(scriptPath, args);
-        const parsed = JSON.parse(rawOutput);
+        const parsed = await requestPythonWorker(scriptPath, {
+            command: 'race_times',
+            year: String(year),
+            event: eventName,
+            session: sessionName
+        });
         if (parsed?.error) throw new Error(parsed.error);
         return parsed;
     } catch (error) {
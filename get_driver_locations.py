@@ -1,7 +1,17 @@
 # get_driver_locations.py
 import sys
 import requests
-import json
+from json_utils import dumps, loads
+from http_session import API_BASE, SESSION as _SESSION, expire_after_for
+from concurrent.futures import ThreadPoolExecutor
+
+def fetch_endpoint(endpoint, session_key, start_time_str, end_time_str):
+    """지정된 시간 구간의 OpenF1 엔드포인트 데이터를 가져옵니다."""
+    url = f"{API_BASE}/{endpoint}?session_key={session_key}&date>={start_time_str}&date<{end_time_str}"
+    # 조회 구간이 끝난 지 오래된 과거 데이터만 오래 캐시
+    response = _SESSION.get(url, timeout=30, expire_after=expire_after_for(end_time_str))
+    response.raise_for_status()
+    return loads(response.content)
 
 def get_data_in_range(session_key, start_time_str, end_time_str):
     """
@@ -14,26 +24,16 @@ def get_data_in_range(session_key, start_time_str, end_time_str):
     error_message = None
 
     try:
-        # 각 API 엔드포인트에 데이터 요청
-        url_loc = f"https://api.openf1.org/v1/location?session_key={session_key}&date>={start_time_str}&date<{end_time_str}"
-        response_loc = requests.get(url_loc, timeout=30)
-        response_loc.raise_for_status()
-        locations = response_loc.json()
-
-        url_pos = f"https://api.openf1.org/v1/position?session_key={session_key}&date>={start_time_str}&date<{end_time_str}"
-        response_pos = requests.get(url_pos, timeout=30)
-        response_pos.raise_for_status()
-        positions = response_pos.json()
-
-        url_car = f"https://api.openf1.org/v1/car_data?session_key={session_key}&date>={start_time_str}&date<{end_time_str}"
-        response_car = requests.get(url_car, timeout=30)
-        response_car.raise_for_status()
-        car_data = response_car.json()
-
-        url_rc = f"https://api.openf1.org/v1/race_control?session_key={session_key}&date>={start_time_str}&date<{end_time_str}"
-        response_rc = requests.get(url_rc, timeout=30)
-        response_rc.raise_for_status()
-        race_control = response_rc.json()
+        # 각 API 엔드포인트는 서로 독립적이므로 동시에 요청
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            f_loc = executor.submit(fetch_endpoint, "location", session_key, start_time_str, end_time_str)
+            f_pos = executor.submit(fetch_endpoint, "position", session_key, start_time_str, end_time_str)
+            f_car = executor.submit(fetch_endpoint, "car_data", session_key, start_time_str, end_time_str)
+            f_rc = executor.submit(fetch_endpoint, "race_control", session_key, start_time_str, end_time_str)
+            locations = f_loc.result()
+            positions = f_pos.result()
+            car_data = f_car.result()
+            race_control = f_rc.result()
 
     except requests.exceptions.RequestException as e:
         error_message = f"API 서버 접속에 실패했습니다. PC의 네트워크 연결 또는 방화벽 설정을 확인해주세요. (원본 에러: {e})"
@@ -42,9 +42,9 @@ def get_data_in_range(session_key, start_time_str, end_time_str):
         error_message = f"데이터 처리 중 알 수 없는 오류가 발생했습니다: {e}"
 
     if error_message:
-        print(json.dumps({"error": error_message, "locations": [], "positions": [], "car_data": [], "race_control": []}))
+        print(dumps({"error": error_message, "locations": [], "positions": [], "car_data": [], "race_control": []}))
     else:
-        print(json.dumps({
+        print(dumps({
             "locations": locations,
             "positions": positions,
             "car_data": car_data,
@@ -53,7 +53,7 @@ def get_data_in_range(session_key, start_time_str, end_time_str):
 
 if __name__ == "__main__":
     if len(sys.argv) != 4:
-        print(json.dumps({"error": "세션 키, 시작 시간, 종료 시간을 인자로 전달해야 합니다."}))
+        print(dumps({"error": "세션 키, 시작 시간, 종료 시간을 인자로 전달해야 합니다."}))
         sys.exit(1)
     
     get_data_in_range(sys.argv[1], sys.argv[2], sys.argv[3])
\ No newline at end of file
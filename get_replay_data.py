@@ -1,16 +1,31 @@
-import fastf1
-import json
+from json_utils import dumps, dumps_bytes, loads
 import sys
 import os
-from datetime import datetime, timedelta
-import pandas as pd
+import re
+import time
+from datetime import timedelta
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'cache')
+RACE_TIMES_TTL = 24 * 60 * 60
+
+_fastf1 = None
+
+# fastf1/pandas는 import 비용이 커서 race_times 캐시가 없을 때만 불러옴
+def _get_fastf1():
+    """처음 필요할 때 한 번만 fastf1을 import하고 캐시를 활성화 (--server 모드에서 재사용)"""
+    global _fastf1
+    if _fastf1 is None:
+        import fastf1
+
+        if not os.path.exists(CACHE_PATH):
+            os.makedirs(CACHE_PATH)
+        fastf1.Cache.enable_cache(CACHE_PATH)
+        _fastf1 = fastf1
+    return _fastf1
 
 def get_session_with_cache(year, event, session_identifier):
-    cache_path = os.path.join(os.path.dirname(__file__), 'cache')
-    if not os.path.exists(cache_path):
-        os.makedirs(cache_path)
-    fastf1.Cache.enable_cache(cache_path)
-    
+    fastf1 = _get_fastf1()
+
     try:
         # --- 수정된 부분: 새로운 함수 사용 ---
         session = fastf1.get_session(int(year), event, session_identifier)
@@ -20,34 +35,53 @@ def get_session_with_cache(year, event, session_identifier):
         return {'error': f"FastF1 세션 로드 실패: {e}"}
 
 def get_race_times(year, event, session_identifier):
+    import pandas as pd
+
     session = get_session_with_cache(year, event, session_identifier)
     if isinstance(session, dict) and 'error' in session:
         return session
 
     all_messages = []
-    if session.race_control_messages is not None and not session.race_control_messages.empty:
-        messages_df = session.race_control_messages.copy()
-        messages_df['Date'] = messages_df['Date'].apply(lambda x: x.isoformat() if pd.notnull(x) else None)
-        messages_df.fillna('', inplace=True)
-        all_messages = messages_df.to_dict(orient='records')
-
     race_start_date = None
     race_end_date = None
+    last_message_date = None
+
+    if session.race_control_messages is not None and not session.race_control_messages.empty:
+        # DataFrame 복사/apply 없이 행을 한 번만 순회하며 dict 생성
+        # 메시지 시각(FastF1은 'Time' 컬럼)은 Timestamp에서 바로 사용하고, 직렬화할 때만 문자열로 변환
+        messages_df = session.race_control_messages
+        columns = list(messages_df.columns)
+        date_columns = {
+            column for column, dtype in messages_df.dtypes.items()
+            if pd.api.types.is_datetime64_any_dtype(dtype)
+        }
+        for row in messages_df.itertuples(index=False, name=None):
+            msg = {}
+            msg_date = None
+            for column, value in zip(columns, row):
+                if column in date_columns:
+                    if pd.notnull(value):
+                        if msg_date is None:
+                            msg_date = value.to_pydatetime()
+                        value = value.isoformat()
+                    else:
+                        value = None
+                elif pd.isnull(value):
+                    value = ''
+                msg[column] = value
+            all_messages.append(msg)
+            last_message_date = msg_date
 
-    if all_messages:
-        for msg in all_messages:
             message_text = msg.get('Message', '').lower()
             if 'race start' in message_text or msg.get('Category', '').lower() == 'racestart':
-                if msg.get('Date'):
-                    race_start_date = datetime.fromisoformat(msg['Date'])
+                if msg_date:
+                    race_start_date = msg_date
             elif 'chequered flag' in message_text:
-                if msg.get('Date'):
-                    race_end_date = datetime.fromisoformat(msg['Date'])
-        
-        if race_start_date and not race_end_date and all_messages:
-            last_message_date_str = all_messages[-1].get('Date')
-            if last_message_date_str:
-                race_end_date = datetime.fromisoformat(last_message_date_str)
+                if msg_date:
+                    race_end_date = msg_date
+
+        if race_start_date and not race_end_date and last_message_date:
+            race_end_date = last_message_date
 
     if not race_start_date and session.date:
         race_start_date = session.date.to_pydatetime()
@@ -74,21 +108,71 @@ def get_race_times(year, event, session_identifier):
         'all_messages': all_messages
     }
 
+def _race_times_cache_path(year, event, session_identifier):
+    name = re.sub(r'[^A-Za-z0-9]+', '_', f"{year}_{event}_{session_identifier}").strip('_')
+    return os.path.join(CACHE_PATH, 'race_times', f"{name}.json")
+
+def get_race_times_cached(year, event, session_identifier):
+    """계산된 race_times 결과를 파일로 저장해두고, 24시간 이내면 재사용합니다."""
+    cache_file = _race_times_cache_path(year, event, session_identifier)
+    if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < RACE_TIMES_TTL:
+        with open(cache_file, 'rb') as f:
+            return loads(f.read())
+
+    result = get_race_times(year, event, session_identifier)
+    if 'error' not in result:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(dumps_bytes(result))
+        os.replace(tmp_file, cache_file)
+    return result
+
+def dispatch(request):
+    """{'command': ..., 'year': ..., 'event': ..., 'session': ...} 형태의 요청을 처리합니다."""
+    command = request.get('command')
+    if command != 'race_times':
+        return {'error': f"Unknown command: {command}"}
+
+    year = request.get('year')
+    event = request.get('event')
+    session_name = request.get('session')
+    if not (year and event and session_name):
+        return {'error': 'Year, event, and session name arguments are required'}
+    return get_race_times_cached(year, event, session_name)
+
+def serve():
+    """
+    stdin으로 한 줄에 하나씩 JSON 요청을 받아 stdout에 {'id': ..., 'result': ...} 한 줄로 응답합니다.
+    프로세스가 계속 살아 있으므로 fastf1/pandas import 비용은 한 번만 발생합니다.
+    """
+    out = sys.stdout
+    # 라이브러리의 print 출력이 응답 줄과 섞이지 않도록 stdout을 stderr로 돌려둠
+    sys.stdout = sys.stderr
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request_id = None
+        try:
+            request = loads(line)
+            request_id = request.get('id')
+            response = dispatch(request)
+        except Exception as e:
+            response = {'error': str(e)}
+        out.write(dumps({'id': request_id, 'result': response}) + '\n')
+        out.flush()
+
 if __name__ == '__main__':
     command = sys.argv[1]
     
-    if command == 'race_times':
+    if command == '--server':
+        serve()
+    elif command == 'race_times':
         # --- 수정된 부분: 인자 파싱 방식 변경 ---
         args = {sys.argv[i].replace('--', ''): sys.argv[i+1] for i in range(2, len(sys.argv), 2)}
-        year = args.get('year')
-        event = args.get('event')
-        session_name = args.get('session')
-        
-        if year and event and session_name:
-            try:
-                result = get_race_times(year, event, session_name)
-                print(json.dumps(result, indent=4))
-            except Exception as e:
-                print(json.dumps({'error': str(e)}))
-        else:
-            print(json.dumps({'error': 'Year, event, and session name arguments are required'}))
\ No newline at end of file
+        try:
+            result = dispatch({'command': command, **args})
+            print(dumps(result, indent=4))
+        except Exception as e:
+            print(dumps({'error': str(e)}))
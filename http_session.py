@@ -0,0 +1,46 @@
+# http_session.py
+"""OpenF1 스크립트들이 공유하는 HTTP 세션 (keep-alive + SQLite 응답 캐시)"""
+import os
+from datetime import datetime, timedelta, timezone
+import requests_cache
+from requests.adapters import HTTPAdapter
+
+API_BASE = "https://api.openf1.org/v1"
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'openf1_http_cache')
+
+RECENT_TTL = 600  # 진행 중이거나 수집이 덜 끝났을 수 있는 데이터 (만료 후 ETag/Last-Modified로 재검증)
+FINISHED_TTL = 86400 * 30  # 확실히 끝난 세션의 데이터
+FINISHED_AFTER = timedelta(hours=6)  # 종료 후 이 시간이 지나면 OpenF1 수집이 끝난 것으로 판단
+
+def _has_data(response):
+    """빈 응답은 세션이 진행 중이거나 아직 수집 전일 수 있으므로 캐시하지 않음"""
+    return response.content.strip() not in (b'', b'[]')
+
+def expire_after_for(date_end):
+    """
+    세션(또는 조회 구간)의 종료 시각으로 캐시 유지 시간을 결정합니다.
+    종료 시각을 알 수 없으면 짧게 보관합니다.
+    """
+    if not date_end:
+        return RECENT_TTL
+    try:
+        end = datetime.fromisoformat(str(date_end).replace('Z', '+00:00'))
+    except ValueError:
+        return RECENT_TTL
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - end > FINISHED_AFTER:
+        return FINISHED_TTL
+    return RECENT_TTL
+
+# 시즌 일정은 1시간, 나머지는 요청마다 expire_after_for로 정한 시간만큼 보관
+SESSION = requests_cache.CachedSession(
+    CACHE_FILE,
+    backend='sqlite',
+    expire_after=RECENT_TTL,
+    urls_expire_after={
+        'api.openf1.org/v1/sessions': 3600,
+    },
+    filter_fn=_has_data,
+)
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
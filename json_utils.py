@@ -0,0 +1,25 @@
+# json_utils.py
+"""orjson이 설치되어 있으면 사용하고, 없으면 표준 json 모듈로 대체합니다."""
+try:
+    import orjson
+
+    def dumps_bytes(obj, indent=None):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    def dumps(obj, indent=None):
+        return dumps_bytes(obj, indent).decode("utf-8")
+
+    loads = orjson.loads
+except ImportError:
+    import json
+
+    def dumps(obj, indent=None):
+        return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+    def dumps_bytes(obj, indent=None):
+        return dumps(obj, indent).encode("utf-8")
+
+    loads = json.loads
@@ -1,9 +1,20 @@
-import requests
-import json
+import httpx
 from datetime import datetime
+import hashlib
+import importlib.util
 import os
+import random
 import re
+import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# scripts/에서 실행되므로 루트의 json_utils를 찾을 수 있도록 repo 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_utils import dumps_bytes, loads
 
 # --- CONFIG ---
 CURRENT_SEASON = datetime.now().year
@@ -11,6 +22,16 @@ BASE_URL = "https://api.jolpi.ca/ergast/f1"
 OUTPUT_DIR_STATS = "public/data/stats"
 OUTPUT_DIR_DRIVERS = "public/data"
 TEAM_COLORS_FILE = "f1_team.json" 
+MAX_WORKERS = 4
+REQUEST_INTERVAL = 0.25  # 요청 간 최소 간격(초), 모든 스레드 공통
+BACKOFF_BASE = 2
+BACKOFF_MAX = 60
+WRITE_WORKERS = 4
+HTTP_TIMEOUT = 30
+PAGE_LIMIT = 100  # Ergast(Jolpica) API의 최대 limit
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+CACHE_TTL = 24 * 60 * 60  # 시즌 종료 후 저장된 응답이 아니면 24시간 후 다시 요청
+USE_CACHE = True
 
 # Slug (URL) 수동 수정
 SLUG_FIXES = {
@@ -25,41 +46,121 @@ NAME_FIXES = {
     "Nico Hülkenberg": "Nico Hulkenberg"
 }
 
-def safe_get_request(url, retries=3, delay=5):
+# 모든 요청이 공유하는 클라이언트 (병렬 작업 스레드 간 공유)
+# h2 패키지가 설치되어 있으면 HTTP/2로 하나의 연결에서 요청을 다중화
+_SESSION = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_connections=20),
+    timeout=HTTP_TIMEOUT,
+    follow_redirects=True
+)
+
+class FetchError(Exception):
+    """재시도 후에도 API 응답을 받지 못한 경우"""
+
+
+# 모든 스레드가 공유하는 요청 간격 제한 (Jolpica는 초당 약 4회까지 허용)
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+def _wait_for_rate_limit():
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + REQUEST_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+def _delay_all_requests(seconds):
+    """429 응답 시 다른 스레드의 다음 요청도 함께 뒤로 미룸"""
+    global _next_request_at
+    with _rate_lock:
+        _next_request_at = max(_next_request_at, time.monotonic() + seconds)
+
+def _backoff_delay(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return int(retry_after) + random.uniform(0, 1)
+    return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) + random.uniform(0, 1)
+
+def safe_get_request(url, retries=5):
     """
-    HTTP GET 요청을 보내고, 429 오류 시 재시도하는 함수
+    HTTP GET 요청을 보내고, 429/5xx/네트워크 오류 시 지수 백오프로 재시도하는 함수
+    끝내 실패하면 FetchError를 발생시킴
     """
-    for i in range(retries):
+    for attempt in range(retries):
+        _wait_for_rate_limit()
+        response = None
         try:
-            response = requests.get(url)
+            response = _SESSION.get(url)
             if response.status_code == 429:
-                print(f"  -> Rate limit exceeded. Retrying in {delay} seconds...")
+                delay = _backoff_delay(attempt, response)
+                print(f"  -> Rate limit exceeded. Retrying in {delay:.1f} seconds...")
+                _delay_all_requests(delay)
                 time.sleep(delay)
                 continue
             response.raise_for_status()
             return response
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"[HTTP ERROR] {e}")
-            if i < retries - 1:
-                print(f"  -> Retrying... ({i+1}/{retries})")
+            if response is not None and 400 <= response.status_code < 500:
+                raise FetchError(f"{url}: HTTP {response.status_code}") from e
+            if attempt < retries - 1:
+                delay = _backoff_delay(attempt)
+                print(f"  -> Retrying in {delay:.1f} seconds... ({attempt+1}/{retries})")
                 time.sleep(delay)
-            else:
-                return None
-    return None
+    raise FetchError(f"{url}: no response after {retries} attempts")
 
+def _cache_path(url):
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def _is_cache_fresh(cache_path, season):
+    """
+    시즌이 끝난 뒤에 저장된 시즌 응답은 더 이상 바뀌지 않으므로 만료시키지 않음
+    (시즌 도중 저장된 응답은 해가 바뀌어도 CACHE_TTL 적용)
+    """
+    mtime = os.path.getmtime(cache_path)
+    if season is not None and datetime.fromtimestamp(mtime).year > int(season):
+        return True
+    return time.time() - mtime < CACHE_TTL
+
+def get_json(url, season=None):
+    """
+    GET 요청 결과를 JSON으로 반환하는 함수 (실패 시 FetchError)
+    응답 원본은 CACHE_DIR에 저장되며, season은 특정 시즌에 한정된 응답일 때 지정
+    """
+    cache_path = _cache_path(url)
+    if USE_CACHE and os.path.exists(cache_path):
+        if _is_cache_fresh(cache_path, season):
+            with open(cache_path, 'rb') as f:
+                return loads(f.read())
+
+    response = safe_get_request(url)
+    data = loads(response.content)
 
+    if USE_CACHE:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, cache_path)
+    return data
+
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+@lru_cache(maxsize=4096)
 def slugify(name):
     name = name.lower()
-    name = re.sub(r'[^a-z0-9]+', '-', name)
+    name = _SLUG_RE.sub('-', name)
     return name.strip('-')
 
 def get_current_drivers():
     url = f"{BASE_URL}/{CURRENT_SEASON}/drivers.json"
-    response = safe_get_request(url)
-    if not response or response.status_code != 200:
-        print(f"[HTTP ERROR] Failed to fetch current drivers from url: {url}")
-        return []
-    data = response.json()
+    data = get_json(url)
     drivers = data['MRData']['DriverTable']['Drivers']
     
     driver_list = []
@@ -86,37 +187,74 @@ def get_current_drivers():
         driver_list.append(driver_info)
     return driver_list
 
-def get_driver_season_stats(driver_id, season):
+def get_season_results(season):
+    """
+    시즌 전체 레이스 결과를 한 번에 가져와 driverId별 레이스 목록으로 반환하는 함수
+    (API 최대 limit이 100이므로 offset으로 페이지를 이어서 요청)
+    """
+    season_results = defaultdict(list)
+    offset = 0
+    while True:
+        url = f"{BASE_URL}/{season}/results.json?limit={PAGE_LIMIT}&offset={offset}"
+        data = get_json(url, season=season)
+        mr_data = data['MRData']
+        for race in mr_data['RaceTable']['Races']:
+            for result in race['Results']:
+                season_results[result['Driver']['driverId']].append(dict(race, Results=[result]))
+        offset += int(mr_data['limit'])
+        if offset >= int(mr_data['total']):
+            return season_results
+
+def get_season_standings(season):
+    """시즌 드라이버 순위를 driverId별로 반환하는 함수"""
+    data = get_json(f"{BASE_URL}/{season}/driverStandings.json?limit={PAGE_LIMIT}", season=season)
+    standings = data['MRData']['StandingsTable']['StandingsLists']
+    if not standings:
+        return {}
+    return {st['Driver']['driverId']: st for st in standings[0].get('DriverStandings', [])}
+
+def summarize_results(races):
+    """
+    레이스 결과 목록을 한 번만 순회하며 포인트, 포디움, 톱10, DNF, 최고 순위를 집계하는 함수
+    """
+    points = 0
+    podiums = top10 = dnfs = 0
+    best_finish = None
+    for r in races:
+        res = r['Results'][0]
+        points += float(res['points'])
+        pos_str = res.get('position')
+        if pos_str and pos_str.isdigit():
+            pos = int(pos_str)
+            if pos <= 3:
+                podiums += 1
+            if pos <= 10:
+                top10 += 1
+            if best_finish is None or pos < best_finish:
+                best_finish = pos
+        status = res['status']
+        if 'Finished' not in status and '+' not in status:
+            dnfs += 1
+    return points, podiums, top10, dnfs, best_finish
+
+def get_driver_season_stats(driver_id, season_results, season_standings):
     season_stats = {}
-    url_results = f"{BASE_URL}/{season}/drivers/{driver_id}/results.json"
-    res_results = safe_get_request(url_results)
-    if not res_results or res_results.status_code != 200:
-        return None, None
-    races = res_results.json()['MRData']['RaceTable']['Races']
+    races = season_results.get(driver_id, [])
 
     if not races:
         return {}, None
 
+    points, podiums, top10, dnfs, _ = summarize_results(races)
     season_stats['gp_races'] = len(races)
-    season_stats['gp_points'] = sum(float(r['Results'][0]['points']) for r in races)
-    season_stats['gp_podiums'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 3)
-    season_stats['gp_top10'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 10)
-    
-    dnfs = 0
-    for r in races:
-        status = r['Results'][0]['status']
-        if 'Finished' not in status and '+' not in status:
-            dnfs += 1
+    season_stats['gp_points'] = points
+    season_stats['gp_podiums'] = podiums
+    season_stats['gp_top10'] = top10
     season_stats['dnfs'] = dnfs
 
-    url_standings = f"{BASE_URL}/{season}/drivers/{driver_id}/driverStandings.json"
-    res_standings = safe_get_request(url_standings)
-    if res_standings and res_standings.status_code == 200:
-        standings = res_standings.json()['MRData']['StandingsTable']['StandingsLists']
-        if standings and standings[0].get('DriverStandings'):
-            driver_standing = standings[0]['DriverStandings'][0]
-            season_stats['season_position'] = driver_standing.get('position')
-            season_stats['season_points'] = driver_standing.get('points')
+    driver_standing = season_standings.get(driver_id)
+    if driver_standing:
+        season_stats['season_position'] = driver_standing.get('position')
+        season_stats['season_points'] = driver_standing.get('points')
 
     team_name = races[-1]['Results'][0]['Constructor']['name'] if races else None
     return season_stats, team_name
@@ -126,64 +264,36 @@ def get_driver_career_stats(driver_id):
     career_stats = {}
     
     url = f"{BASE_URL}/drivers/{driver_id}/results.json?limit=1000"
-    res = safe_get_request(url)
-    if not res or res.status_code != 200:
-        return None
-    races = res.json()['MRData']['RaceTable']['Races']
+    data = get_json(url)
+    races = data['MRData']['RaceTable']['Races']
     
+    points, podiums, _, dnfs, best_finish = summarize_results(races)
     career_stats['gp_entered'] = len(races)
-    career_stats['career_points'] = sum(float(r['Results'][0]['points']) for r in races)
-    career_stats['podiums'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 3)
-    
-    dnfs = 0
-    for r in races:
-        status = r['Results'][0]['status']
-        if 'Finished' not in status and '+' not in status:
-            dnfs += 1
+    career_stats['career_points'] = points
+    career_stats['podiums'] = podiums
     career_stats['dnfs'] = dnfs
 
-    poles_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/results/1.json")
-    if poles_res and poles_res.status_code == 200:
-        career_stats['poles'] = int(poles_res.json()['MRData']['total'])
-    else:
-        career_stats['poles'] = 0
+    poles_data = get_json(f"{BASE_URL}/drivers/{driver_id}/results/1.json")
+    career_stats['poles'] = int(poles_data['MRData']['total'])
 
-    best_finish_pos = float('inf')
-    for r in races:
-        pos_str = r['Results'][0].get('position')
-        if pos_str and pos_str.isdigit():
-            pos = int(pos_str)
-            if pos < best_finish_pos:
-                best_finish_pos = pos
-    career_stats['best_finish'] = best_finish_pos if best_finish_pos != float('inf') else '-'
-
-    best_grid_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/qualifying.json?limit=1000")
-    if best_grid_res and best_grid_res.status_code == 200:
-        qualifying_results = best_grid_res.json()['MRData']['RaceTable']['Races']
-        if qualifying_results:
-            best_grid_positions = [int(q['QualifyingResults'][0]['position']) for q in qualifying_results if q.get('QualifyingResults') and q['QualifyingResults'][0].get('position')]
-            if best_grid_positions:
-                career_stats['best_grid'] = min(best_grid_positions)
-            else:
-                career_stats['best_grid'] = '-'
-        else:
-            career_stats['best_grid'] = '-'
-    else:
-        career_stats['best_grid'] = '-'
+    career_stats['best_finish'] = best_finish if best_finish is not None else '-'
 
-    seasons_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/seasons.json?limit=100")
-    if not seasons_res or seasons_res.status_code != 200:
-        return None
+    best_grid_data = get_json(f"{BASE_URL}/drivers/{driver_id}/qualifying.json?limit=1000")
+    qualifying_results = best_grid_data['MRData']['RaceTable']['Races']
+    best_grid_positions = [int(q['QualifyingResults'][0]['position']) for q in qualifying_results if q.get('QualifyingResults') and q['QualifyingResults'][0].get('position')]
+    career_stats['best_grid'] = min(best_grid_positions) if best_grid_positions else '-'
+
+    seasons_data = get_json(f"{BASE_URL}/drivers/{driver_id}/seasons.json?limit=100")
     
-    seasons = [s['season'] for s in seasons_res.json()['MRData']['SeasonTable']['Seasons']]
+    seasons = [s['season'] for s in seasons_data['MRData']['SeasonTable']['Seasons']]
     
     standings_data = []
     for season in seasons:
-        standing_res = safe_get_request(f"{BASE_URL}/{season}/drivers/{driver_id}/driverStandings.json")
-        if standing_res and standing_res.status_code == 200:
-            season_standings = standing_res.json()['MRData']['StandingsTable']['StandingsLists']
-            if season_standings:
-                standings_data.extend(season_standings)
+        standing_data = get_json(
+            f"{BASE_URL}/{season}/drivers/{driver_id}/driverStandings.json",
+            season=season
+        )
+        standings_data.extend(standing_data['MRData']['StandingsTable']['StandingsLists'])
 
     if standings_data:
         valid_standings = [
@@ -200,13 +310,28 @@ def get_driver_career_stats(driver_id):
 
     return career_stats
 
+def _driver_job(driver):
+    """커리어 통계를 반환하며, 요청이 하나라도 실패하면 부분 통계 대신 None을 반환"""
+    print(f"Processing {driver['full_name']}...")
+    try:
+        return get_driver_career_stats(driver['driverId'])
+    except FetchError as e:
+        print(f"[ERROR] Failed to build career stats for {driver['full_name']}: {e}")
+        return None
+
+def _write_stats_file(item):
+    output_path, driver_stats = item
+    with open(output_path, 'wb') as f:
+        f.write(dumps_bytes(driver_stats, indent=2))
+    print(f"  -> Saved stats to {output_path}")
+
 def main():
     if not os.path.exists(OUTPUT_DIR_STATS):
         os.makedirs(OUTPUT_DIR_STATS)
 
     try:
-        with open(TEAM_COLORS_FILE, 'r', encoding='utf-8') as f:
-            team_colors_data = json.load(f)
+        with open(TEAM_COLORS_FILE, 'rb') as f:
+            team_colors_data = loads(f.read())
         # --- 수정된 부분 ---
         team_color_map = {team['name']: team['teamColor'] for team in team_colors_data}
     except FileNotFoundError:
@@ -215,16 +340,28 @@ def main():
 
     all_drivers_data = get_current_drivers()
 
-    for driver in all_drivers_data:
-        print(f"Processing {driver['full_name']}...")
-        
-        season_stats, team_name = get_driver_season_stats(driver['driverId'], CURRENT_SEASON)
-        career_stats = get_driver_career_stats(driver['driverId'])
-        
+    # 시즌 통계는 전체 결과/순위를 한 번씩만 요청해서 드라이버별로 계산
+    season_results = get_season_results(CURRENT_SEASON)
+    season_standings = get_season_standings(CURRENT_SEASON)
+
+    # 드라이버별 커리어 통계 요청은 서로 독립적이므로 병렬로 가져옴
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        career_results = list(executor.map(_driver_job, all_drivers_data))
+
+    stats_files = []
+    failed_drivers = []
+    for driver, career_stats in zip(all_drivers_data, career_results):
+        # 팀 정보는 시즌 데이터에서 오므로 커리어 통계 실패와 관계없이 drivers.json에 반영
+        season_stats, team_name = get_driver_season_stats(driver['driverId'], season_results, season_standings)
         if team_name:
             driver['team_name'] = team_name
             driver['team_colour'] = team_color_map.get(team_name, '#FFFFFF')
 
+        if career_stats is None:
+            # 기존 stats 파일을 잘못된 값으로 덮어쓰지 않도록 저장하지 않음
+            failed_drivers.append(driver['full_name'])
+            continue
+
         driver_stats = {
             "info": driver,
             "season": season_stats,
@@ -232,17 +369,27 @@ def main():
         }
 
         output_path = os.path.join(OUTPUT_DIR_STATS, f"{driver['slug']}.json")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(driver_stats, f, ensure_ascii=False, indent=2)
-        
-        print(f"  -> Saved stats to {output_path}")
-        time.sleep(1.1)
+        stats_files.append((output_path, driver_stats))
+
+    # 작은 파일 여러 개의 open/write/close 대기 시간을 겹치도록 병렬로 저장
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        list(executor.map(_write_stats_file, stats_files))
 
     drivers_output_path = os.path.join(OUTPUT_DIR_DRIVERS, "drivers.json")
-    with open(drivers_output_path, 'w', encoding='utf-8') as f:
-        json.dump(all_drivers_data, f, ensure_ascii=False, indent=2)
+    with open(drivers_output_path, 'wb') as f:
+        f.write(dumps_bytes(all_drivers_data, indent=2))
     print(f"\nSaved all drivers list to {drivers_output_path}")
 
+    if failed_drivers:
+        print(f"\n[ERROR] Stats were not updated for: {', '.join(failed_drivers)}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--no-cache" in sys.argv[1:]:
+        USE_CACHE = False
+    try:
+        main()
+    except FetchError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
\ No newline at end of file